@@ -1,7 +1,7 @@
 # app/__init__.py
 
 import os
-from flask import Flask, redirect, url_for, request
+from flask import Flask, redirect, url_for, request, current_app
 from flask_sqlalchemy import SQLAlchemy
 from flask_jwt_extended import JWTManager
 from flask_migrate import Migrate
@@ -11,6 +11,8 @@ from dotenv import load_dotenv
 from flask_admin import Admin, AdminIndexView, expose
 from flask_admin.contrib.sqla import ModelView
 from flask_login import LoginManager, current_user
+from sqlalchemy.orm import undefer
+from markupsafe import Markup
 
 # 加载环境变量
 load_dotenv()
@@ -33,7 +35,9 @@ class MyAdminIndexView(AdminIndexView):
     def index(self):
         if not current_user.is_authenticated or not getattr(current_user, 'is_admin', False):
             return redirect(url_for('auth.login', next=request.url))
-        return super(MyAdminIndexView, self).index()
+        # 只读取 rollup 表，加载时间与翻译历史总量无关
+        from app.utils.usage import usage_dashboard
+        return self.render(self._template, stats=usage_dashboard(current_app.config['ADMIN_DASHBOARD_DAYS']))
 
     def is_accessible(self):
         return current_user.is_authenticated and getattr(current_user, 'is_admin', False)
@@ -49,6 +53,33 @@ class MyModelView(ModelView):
     def inaccessible_callback(self, name, **kwargs):
         return redirect(url_for('auth.login', next=request.url))
 
+# 用户管理视图：翻译数量随列表查询一并取出，避免逐行懒加载 User.translations
+class UserModelView(MyModelView):
+    column_list = ('id', 'username', 'email', 'is_admin', 'translation_count')
+    column_sortable_list = ('id', 'username', 'email', 'is_admin')
+    column_default_sort = 'id'
+    column_labels = {'translation_count': '翻译数'}
+    form_excluded_columns = ('translations',)  # 避免编辑表单加载全部翻译记录
+    page_size = 50
+
+    def get_query(self):
+        return super(UserModelView, self).get_query().options(undefer(self.model.translation_count))
+
+# 请求分析报告：只读，供管理员查看慢请求与 N+1 查询
+class ProfileReportView(MyModelView):
+    can_create = False
+    can_edit = False
+    can_view_details = True
+    column_list = ('created_at', 'method', 'path', 'status', 'duration_ms',
+                   'query_count', 'query_time_ms', 'repeated_query_count')
+    column_default_sort = ('created_at', True)
+    column_filters = ('path', 'status', 'repeated_query_count')
+    column_labels = {'repeated_query_count': 'N+1 疑似'}
+    column_formatters_detail = {
+        name: (lambda view, context, model, name: Markup('<pre>{}</pre>').format(getattr(model, name) or ''))
+        for name in ('queries', 'repeated_queries', 'profile')
+    }
+
 def create_app():
     app = Flask(__name__)
     app.config.from_object('config')  # 使用配置类
@@ -61,8 +92,12 @@ def create_app():
     api.init_app(app)
     login_manager.init_app(app)
 
+    # 密码哈希线程池
+    from app.utils.passwords import init_password_hasher
+    init_password_hasher(app)
+
     # 导入所有模型以确保 Alembic 能检测到它们
-    from app.models import User, Translation  # 添加所有模型
+    from app.models import User, Translation, ProfileReport, UsageRollup  # 添加所有模型
 
     # 注册 Flask-RESTX 命名空间
     from app.routes import auth_ns, translate_ns, users_ns
@@ -76,7 +111,15 @@ def create_app():
 
     # 初始化 Flask-Admin，使用自定义 AdminIndexView
     admin = Admin(app, name='管理后台', template_mode='bootstrap3', index_view=MyAdminIndexView())
-    admin.add_view(MyModelView(User, db.session))  # 使用自定义 MyModelView
+    user_view = UserModelView(User, db.session)
+    user_view.simple_list_pager = app.config['ADMIN_SIMPLE_PAGER']  # 大表可跳过 COUNT(*)
+    admin.add_view(user_view)
+    admin.add_view(ProfileReportView(ProfileReport, db.session, name='请求分析'))
+
+    # 请求分析钩子（按配置开启）
+    if app.config['PROFILING_ENABLED']:
+        from app.utils.profiling import init_profiling
+        init_profiling(app)
 
     # 创建上传文件夹，如果不存在则创建，并处理权限错误
     try:
@@ -85,6 +128,14 @@ def create_app():
         app.logger.error(f"Permission denied while creating directory: {app.config['UPLOAD_FOLDER']}")
         raise
 
+    # 使用量 rollup（随翻译记录增量更新、backfill-usage 命令）
+    from app.utils.usage import init_usage
+    init_usage(app)
+
+    # 上传文件清理（删除记录时同步删除文件、gc-uploads 命令）
+    from app.utils.upload_gc import init_upload_gc
+    init_upload_gc(app)
+
     return app
 
 # Flask-Login 用户加载回调
@@ -1,23 +1,34 @@
 # app/models.py
 
+from datetime import datetime
 from . import db
 from flask_login import UserMixin
-from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy import func, select
+from app.utils.passwords import hash_password, verify_password, needs_rehash, PasswordHashingOverloaded
 
 class User(db.Model, UserMixin):
     __tablename__ = 'users'  # 表名为 'users'
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(150), unique=True, nullable=False)
-    password_hash = db.Column(db.String(150), nullable=False)
+    email = db.Column(db.String(150), unique=True, nullable=True)
+    password_hash = db.Column(db.String(255), nullable=False)  # scrypt 哈希长于 150
     is_admin = db.Column(db.Boolean, default=False)  # 用于标识是否为管理员
 
-    translations = db.relationship('Translation', backref='user', lazy=True)
+    translations = db.relationship('Translation', backref='user', lazy=True, cascade='all, delete-orphan')
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        """校验密码；哈希参数已变更时顺带用新参数重新哈希（由调用方提交）"""
+        if not verify_password(self.password_hash, password):
+            return False
+        if needs_rehash(self.password_hash):
+            try:
+                self.set_password(password)
+            except PasswordHashingOverloaded:
+                pass  # 密码已校验通过，繁忙时跳过升级，下次登录再重试
+        return True
 
     def __repr__(self):
         return f'<User {self.username}>'
@@ -25,8 +36,56 @@ class User(db.Model, UserMixin):
 class Translation(db.Model):
     __tablename__ = 'translations'
     id = db.Column(db.Integer, primary_key=True)
-    content = db.Column(db.Text, nullable=False)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)  # 外键引用 'users.id'
+    content = db.Column(db.Text, nullable=True)
+    original_text = db.Column(db.Text, nullable=True)
+    translated_text = db.Column(db.Text, nullable=True)
+    image_path = db.Column(db.String(255), nullable=True)
+    llm_latency_ms = db.Column(db.Float, nullable=True)  # 调用 LLM 的耗时
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)  # 外键引用 'users.id'
 
     def __repr__(self):
-        return f'<Translation {self.id} by User {self.user_id}>'
\ No newline at end of file
+        return f'<Translation {self.id} by User {self.user_id}>'
+
+class UsageRollup(db.Model):
+    """每日每用户的翻译计数，随 Translation 插入在同一事务中累加"""
+    __tablename__ = 'usage_rollups'
+    day = db.Column(db.Date, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    translations = db.Column(db.Integer, nullable=False, default=0)
+    image_translations = db.Column(db.Integer, nullable=False, default=0)
+    text_translations = db.Column(db.Integer, nullable=False, default=0)
+    latency_ms_total = db.Column(db.Float, nullable=False, default=0)
+    latency_samples = db.Column(db.Integer, nullable=False, default=0)  # 有耗时记录的翻译数
+
+    def __repr__(self):
+        return f'<UsageRollup {self.day} by User {self.user_id}>'
+
+class ProfileReport(db.Model):
+    __tablename__ = 'profile_reports'
+    id = db.Column(db.Integer, primary_key=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+    method = db.Column(db.String(10), nullable=False)
+    path = db.Column(db.String(255), nullable=False)
+    status = db.Column(db.Integer)
+    duration_ms = db.Column(db.Float)
+    query_count = db.Column(db.Integer)
+    query_time_ms = db.Column(db.Float)
+    repeated_query_count = db.Column(db.Integer)  # 疑似 N+1 的重复 SQL 条数
+    queries = db.Column(db.Text)  # JSON：全部 SQL 及耗时
+    repeated_queries = db.Column(db.Text)  # JSON：重复执行的 SQL
+    profile = db.Column(db.Text)  # 采样得到的折叠调用栈
+
+    def __repr__(self):
+        return f'<ProfileReport {self.id} {self.method} {self.path}>'
+
+# 每个用户的翻译数量：关联子查询，走 translations.user_id 索引，
+# 默认延迟加载，需要时通过 undefer(User.translation_count) 与用户行一起查出，
+# 避免逐个访问 User.translations 触发的懒加载（N+1）。
+User.translation_count = db.column_property(
+    select(func.count(Translation.id))
+    .where(Translation.user_id == User.id)
+    .correlate_except(Translation)
+    .scalar_subquery(),
+    deferred=True,
+)
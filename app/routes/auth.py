@@ -3,6 +3,7 @@ from flask_restx import Namespace, Resource, fields
 from flask import request
 from app import db
 from app.models import User
+from app.utils.passwords import PasswordHashingOverloaded
 from flask_jwt_extended import create_access_token
 
 auth_ns = Namespace('auth', description='Authentication operations')
@@ -22,6 +23,7 @@ class Register(Resource):
     @auth_ns.expect(register_model)
     @auth_ns.response(201, 'User registered successfully')
     @auth_ns.response(400, 'Validation Error')
+    @auth_ns.response(503, 'Password hashing overloaded')
     def post(self):
         data = request.get_json()
         username = data.get('username')
@@ -34,7 +36,10 @@ class Register(Resource):
             return {'msg': 'Username already exists'}, 400
         
         user = User(username=username)
-        user.set_password(password)
+        try:
+            user.set_password(password)
+        except PasswordHashingOverloaded as e:
+            return e.data, 503, {'Retry-After': str(e.retry_after)}
         db.session.add(user)
         db.session.commit()
         
@@ -45,14 +50,19 @@ class Login(Resource):
     @auth_ns.expect(login_model)
     @auth_ns.response(200, 'Login successful')
     @auth_ns.response(401, 'Invalid credentials')
+    @auth_ns.response(503, 'Password hashing overloaded')
     def post(self):
         data = request.get_json()
         username = data.get('username')
         password = data.get('password')
         
         user = User.query.filter_by(username=username).first()
-        if not user or not user.check_password(password):
-            return {'msg': 'Invalid credentials'}, 401
+        try:
+            if not user or not user.check_password(password):
+                return {'msg': 'Invalid credentials'}, 401
+        except PasswordHashingOverloaded as e:
+            return e.data, 503, {'Retry-After': str(e.retry_after)}
+        db.session.commit()  # 保存可能发生的重新哈希
         
         access_token = create_access_token(identity=user.id)
         return {'access_token': access_token}, 200
\ No newline at end of file
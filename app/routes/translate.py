@@ -1,12 +1,14 @@
 # app/routes/translate.py
 from flask_restx import Namespace, Resource, fields
-from flask import request, jsonify, current_app, send_from_directory
+from flask import request, jsonify, current_app, send_from_directory, Response, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.models import Translation, User
 from app import db
 from app.utils.image_processing import encode_image, compress_image
 from app.utils.translation import translate_recipe
+from app.utils.archive import export_ndjson, export_zip, import_archive
 import os
+import time
 
 translate_ns = Namespace('translate', description='Translation operations')
 
@@ -50,13 +52,16 @@ class Translate(Resource):
         if not text and not image_base64:
             return {'msg': 'No text or image provided for translation'}, 400
         
+        started = time.perf_counter()
         translated_text = translate_recipe(text if text else "", image_base64)
+        llm_latency_ms = (time.perf_counter() - started) * 1000
         
         # Save translation record
         translation = Translation(
             original_text=text if text else '',
             translated_text=translated_text,
             image_path=image_path,
+            llm_latency_ms=llm_latency_ms,
             user_id=user_id
         )
         db.session.add(translation)
@@ -93,4 +98,38 @@ class Translations(Resource):
                 'image_url': f"/api/uploads/{os.path.basename(t.image_path)}" if t.image_path else None,
                 'created_at': t.created_at
             })
-        return result, 200
\ No newline at end of file
+        return result, 200
+
+export_parser = translate_ns.parser()
+export_parser.add_argument('format', type=str, location='args', choices=('zip', 'ndjson'), default='zip',
+                           help='zip 含原图文件，ndjson 将图片以 base64 内联')
+
+@translate_ns.route('/translations/export')
+class TranslationsExport(Resource):
+    @jwt_required()
+    @translate_ns.expect(export_parser)
+    def get(self):
+        user_id = get_jwt_identity()
+        if export_parser.parse_args()['format'] == 'ndjson':
+            return Response(stream_with_context(export_ndjson(user_id)), mimetype='application/x-ndjson',
+                            headers={'Content-Disposition': 'attachment; filename=translations.ndjson'})
+        return Response(stream_with_context(export_zip(user_id)), mimetype='application/zip',
+                        headers={'Content-Disposition': 'attachment; filename=translations.zip'})
+
+@translate_ns.route('/translations/import')
+class TranslationsImport(Resource):
+    @jwt_required()
+    @translate_ns.expect(translate_ns.parser()
+        .add_argument('file', type='file', location='files', required=True, help='Archive produced by /translations/export'))
+    @translate_ns.response(201, 'Import completed')
+    @translate_ns.response(400, 'Invalid archive')
+    def post(self):
+        user_id = get_jwt_identity()
+        file = request.files.get('file')
+        if not file:
+            return {'msg': 'No archive provided'}, 400
+        try:
+            imported = import_archive(user_id, file.stream)
+        except ValueError as e:
+            return {'msg': str(e)}, 400
+        return {'msg': 'Import completed', 'imported': imported}, 201
\ No newline at end of file
@@ -1,7 +1,9 @@
 # app/routes/users.py
 
-from flask_restx import Namespace, Resource, fields
-from flask import request
+import json
+from flask_restx import Namespace, Resource, fields, marshal
+from flask import request, current_app, Response, stream_with_context
+from sqlalchemy.orm import load_only, undefer
 from app import db
 from app.models import User
 from flask_jwt_extended import (
@@ -17,6 +19,18 @@ user_model = users_ns.model('User', {
     'email': fields.String(required=True, description='用户邮箱')
 })
 
+# 列表接口可额外返回翻译数量（按需查询，见 fields 参数）
+user_list_model = users_ns.inherit('UserListItem', user_model, {
+    'translation_count': fields.Integer(readOnly=True, description='翻译记录数')
+})
+
+user_list_parser = users_ns.parser()
+user_list_parser.add_argument('limit', type=int, location='args', help='每页数量')
+user_list_parser.add_argument('after', type=int, location='args', help='游标：上一页最后一个用户ID（见响应头 X-Next-Cursor）')
+user_list_parser.add_argument('fields', type=str, location='args', help='逗号分隔的返回字段，如 id,username,translation_count')
+user_list_parser.add_argument('format', type=str, location='args', choices=('json', 'ndjson'), default='json',
+                              help='json 为分页列表，ndjson 为流式导出全部用户')
+
 user_create_model = users_ns.model('UserCreate', {
     'username': fields.String(required=True, description='用户名'),
     'email': fields.String(required=True, description='用户邮箱'),
@@ -29,14 +43,64 @@ user_update_model = users_ns.model('UserUpdate', {
     'password': fields.String(description='密码')
 })
 
+def _parse_list_fields(raw):
+    """解析 fields 参数，返回 (字段列表, 错误信息)"""
+    names = [name.strip() for name in (raw or '').split(',') if name.strip()]
+    if not names:
+        return list(user_model.keys()), None
+    unknown = [name for name in names if name not in user_list_model.resolved]
+    if unknown:
+        return None, f"Unknown fields: {', '.join(unknown)}"
+    return names, None
+
+def _user_list_query(names):
+    """只查询所需字段，按主键排序以支持 keyset 分页"""
+    columns = [User.id] + [getattr(User, name) for name in names if name not in ('id', 'translation_count')]
+    query = User.query.options(load_only(*columns))
+    if 'translation_count' in names:
+        query = query.options(undefer(User.translation_count))
+    return query.order_by(User.id)
+
 @users_ns.route('/')
 class UserList(Resource):
-    @users_ns.marshal_list_with(user_model)
+    @users_ns.expect(user_list_parser)
+    @users_ns.response(200, '用户列表', [user_list_model])
+    @users_ns.response(400, '参数错误')
     @jwt_required()
     def get(self):
-        """获取所有用户"""
-        users = User.query.all()
-        return users
+        """获取用户列表（keyset 分页、字段选择、NDJSON 流式导出）"""
+        args = user_list_parser.parse_args()
+        names, error = _parse_list_fields(args['fields'])
+        if error:
+            return {'msg': error}, 400
+        mask = '{' + ','.join(names) + '}'
+
+        query = _user_list_query(names)
+        if args['after'] is not None:
+            query = query.filter(User.id > args['after'])
+
+        if args['format'] == 'ndjson':
+            # 服务端游标分批读取，内存占用与用户总数无关
+            batch_size = current_app.config['USERS_STREAM_BATCH_SIZE']
+
+            def generate():
+                for user in query.yield_per(batch_size):
+                    yield json.dumps(marshal(user, user_list_model, mask=mask), ensure_ascii=False) + '\n'
+
+            return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+        limit = args['limit'] if args['limit'] is not None else current_app.config['USERS_PAGE_SIZE']
+        if limit < 1:
+            return {'msg': 'limit must be positive'}, 400
+        limit = min(limit, current_app.config['USERS_MAX_PAGE_SIZE'])
+
+        # 多取一行用于判断是否还有下一页
+        users = query.limit(limit + 1).all()
+        headers = {}
+        if len(users) > limit:
+            users = users[:limit]
+            headers['X-Next-Cursor'] = str(users[-1].id)
+        return marshal(users, user_list_model, mask=mask), 200, headers
 
     @users_ns.expect(user_create_model)
     @users_ns.marshal_with(user_model, code=201)
@@ -0,0 +1,235 @@
+# app/utils/archive.py
+import base64
+import hashlib
+import io
+import json
+import os
+import tempfile
+import time
+import zipfile
+from datetime import datetime, timezone
+
+from flask import current_app
+from app import db
+from app.models import Translation
+from app.utils.image_processing import encode_image
+from app.utils.usage import record_translations
+
+MANIFEST_NAME = 'translations.ndjson'
+TEXT_FIELDS = ('image', 'image_base64', 'created_at', 'original_text', 'translated_text')
+IMAGE_DIR = 'images'
+CHUNK_SIZE = 64 * 1024
+
+
+class _StreamBuffer(io.RawIOBase):
+    """只写缓冲区：ZipFile 写入的字节由生成器随时取走，归档不会整体驻留内存"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _user_translations(user_id):
+    batch_size = current_app.config['EXPORT_BATCH_SIZE']
+    return (Translation.query.filter_by(user_id=user_id)
+            .order_by(Translation.id)
+            .yield_per(batch_size))
+
+
+def _upload_path(image_path):
+    """返回上传文件在 UPLOAD_FOLDER 中的路径；文件不存在时返回 None"""
+    if not image_path:
+        return None
+    path = os.path.join(current_app.config['UPLOAD_FOLDER'], os.path.basename(image_path))
+    return path if os.path.isfile(path) else None
+
+
+def _manifest_row(translation, image):
+    return {
+        'id': translation.id,
+        'original_text': translation.original_text,
+        'translated_text': translation.translated_text,
+        'created_at': translation.created_at.isoformat() if translation.created_at else None,
+        'image': image,
+    }
+
+
+def export_ndjson(user_id):
+    """逐行导出翻译记录，图片以 base64 内联在 image_base64 字段中"""
+    for translation in _user_translations(user_id):
+        path = _upload_path(translation.image_path)
+        row = _manifest_row(translation, os.path.basename(path) if path else None)
+        if path:
+            row['image_base64'] = encode_image(path)
+        yield json.dumps(row, ensure_ascii=False) + '\n'
+
+
+def export_zip(user_id):
+    """流式生成 zip 归档：translations.ndjson 加 images/ 目录下的原图"""
+    buffer = _StreamBuffer()
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        with archive.open(MANIFEST_NAME, 'w', force_zip64=True) as manifest:
+            for translation in _user_translations(user_id):
+                path = _upload_path(translation.image_path)
+                row = _manifest_row(translation, os.path.basename(path) if path else None)
+                manifest.write((json.dumps(row, ensure_ascii=False) + '\n').encode('utf-8'))
+                yield buffer.drain()
+
+        # 第二遍只取去重后的图片路径，同一张图只写入一次
+        image_paths = (db.session.query(Translation.image_path)
+                       .filter(Translation.user_id == user_id, Translation.image_path.isnot(None))
+                       .distinct()
+                       .yield_per(current_app.config['EXPORT_BATCH_SIZE']))
+        for (image_path,) in image_paths:
+            path = _upload_path(image_path)
+            if not path:
+                continue
+            info = zipfile.ZipInfo(f'{IMAGE_DIR}/{os.path.basename(path)}',
+                                   date_time=time.localtime(os.path.getmtime(path))[:6])
+            info.compress_type = zipfile.ZIP_STORED  # 图片本身已压缩
+            with open(path, 'rb') as source, archive.open(info, 'w', force_zip64=True) as target:
+                for chunk in iter(lambda: source.read(CHUNK_SIZE), b''):
+                    target.write(chunk)
+                    yield buffer.drain()
+    yield buffer.drain()
+
+
+def _store_blob(source, filename):
+    """按内容哈希保存到 UPLOAD_FOLDER，相同内容只保留一份，返回文件路径"""
+    upload_folder = current_app.config['UPLOAD_FOLDER']
+    digest = hashlib.sha256()
+    fd, tmp_path = tempfile.mkstemp(dir=upload_folder, prefix='.import-')
+    try:
+        with os.fdopen(fd, 'wb') as tmp:
+            for chunk in iter(lambda: source.read(CHUNK_SIZE), b''):
+                digest.update(chunk)
+                tmp.write(chunk)
+        ext = os.path.splitext(filename)[1].lower()
+        path = os.path.join(upload_folder, digest.hexdigest() + ext)
+        if os.path.exists(path):
+            os.remove(tmp_path)
+        else:
+            os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return path
+
+
+def _parse_row(line):
+    row = json.loads(line)
+    if not isinstance(row, dict):
+        raise ValueError('Invalid archive: manifest line is not a JSON object')
+    for field in TEXT_FIELDS:
+        if row.get(field) is not None and not isinstance(row[field], str):
+            raise ValueError(f'Invalid archive: {field} must be a string or null')
+    return row
+
+
+def _parse_created_at(value):
+    """解析 ISO 时间；带时区的值转换为 created_at 列使用的 naive UTC"""
+    if not value:
+        return datetime.utcnow()
+    created_at = datetime.fromisoformat(value)
+    if created_at.tzinfo is not None:
+        created_at = created_at.astimezone(timezone.utc).replace(tzinfo=None)
+    return created_at
+
+
+def _zip_rows(archive):
+    try:
+        manifest = archive.open(MANIFEST_NAME)
+    except KeyError:
+        raise ValueError(f'Archive has no {MANIFEST_NAME}')
+    with manifest:
+        for line in io.TextIOWrapper(manifest, encoding='utf-8'):
+            if not line.strip():
+                continue
+            row = _parse_row(line)
+            image = os.path.basename(row.get('image') or '')
+            if image:
+                row['_blob'] = lambda image=image: archive.open(f'{IMAGE_DIR}/{image}')
+            yield row
+
+
+def _ndjson_rows(stream):
+    for line in io.TextIOWrapper(stream, encoding='utf-8'):
+        if not line.strip():
+            continue
+        row = _parse_row(line)
+        image_base64 = row.pop('image_base64', None)
+        if image_base64:
+            row['_blob'] = lambda data=image_base64: io.BytesIO(base64.b64decode(data, validate=True))
+        yield row
+
+
+def import_archive(user_id, stream):
+    """导入 export_zip/export_ndjson 生成的归档，分批插入记录，返回导入条数
+
+    归档格式错误时抛出 ValueError。
+    """
+    batch_size = current_app.config['IMPORT_BATCH_SIZE']
+    blobs = {}  # zip 内图片名 -> 已保存路径，同一成员只解压一次；NDJSON 内联图片按内容哈希去重
+    batch = []
+    count = 0
+
+    def flush():
+        # bulk_insert_mappings 不触发 ORM 事件，rollup 需要单独累加
+        db.session.bulk_insert_mappings(Translation, batch)
+        record_translations(db.session.connection(), batch)
+        batch.clear()
+
+    archive = zipfile.ZipFile(stream) if zipfile.is_zipfile(stream) else None
+    if archive is None:
+        stream.seek(0)
+    try:
+        rows = _zip_rows(archive) if archive else _ndjson_rows(stream)
+        for row in rows:
+            image = os.path.basename(row.get('image') or '')
+            image_path = None
+            if '_blob' in row:
+                # NDJSON 中同名图片的内容可能不同（如多个导出拼接），不能按名称缓存
+                image_path = blobs.get(image) if archive else None
+                if image_path is None:
+                    try:
+                        with row['_blob']() as source:
+                            image_path = _store_blob(source, image)
+                    except KeyError:
+                        raise ValueError(f'Archive has no image {image}')
+                    if archive:
+                        blobs[image] = image_path
+            batch.append({
+                'user_id': user_id,
+                'original_text': row.get('original_text'),
+                'translated_text': row.get('translated_text'),
+                'image_path': image_path,
+                'created_at': _parse_created_at(row.get('created_at')),
+            })
+            count += 1
+            if len(batch) >= batch_size:
+                flush()
+        if batch:
+            flush()
+        db.session.commit()
+    except (json.JSONDecodeError, UnicodeDecodeError, zipfile.BadZipFile) as e:
+        db.session.rollback()
+        raise ValueError(f'Invalid archive: {e}')
+    except BaseException:
+        db.session.rollback()
+        raise
+    finally:
+        if archive:
+            archive.close()
+    return count
@@ -0,0 +1,113 @@
+# app/utils/passwords.py
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app, has_app_context
+from werkzeug.exceptions import ServiceUnavailable
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, generate_password_hash, check_password_hash
+
+
+class PasswordHashingOverloaded(ServiceUnavailable):
+    """等待哈希的请求超过队列上限"""
+    description = 'Too many concurrent login attempts, please retry shortly'
+
+    def __init__(self, retry_after=1):
+        super().__init__()
+        self.retry_after = retry_after
+        self.data = {'msg': self.description}
+
+    def get_headers(self, environ=None, scope=None):
+        return super().get_headers(environ, scope) + [('Retry-After', str(self.retry_after))]
+
+
+class PasswordHasher:
+    """在有界线程池中执行密码哈希与校验
+
+    hashlib 的 pbkdf2/scrypt 计算期间会释放 GIL；限制并发数避免登录高峰占满 CPU，
+    排队数超过 queue_limit 时立即抛出 PasswordHashingOverloaded（503）。
+    """
+
+    def __init__(self, workers, queue_limit):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash')
+        self._slots = threading.BoundedSemaphore(queue_limit)
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHashingOverloaded()
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future.result()
+
+    def hash(self, password, method, salt_length):
+        return self._run(generate_password_hash, password, method, salt_length)
+
+    def verify(self, pwhash, password):
+        return self._run(check_password_hash, pwhash, password)
+
+
+def normalize_hash_method(method):
+    """把 'scrypt'、'pbkdf2:sha256' 等简写补全为 Werkzeug 存入哈希的完整参数，不支持的方法抛出 ValueError"""
+    name, *args = method.split(':')
+    if name == 'scrypt':
+        if not args:
+            args = ['32768', '8', '1']
+        if len(args) != 3 or not all(arg.isdigit() for arg in args):
+            raise ValueError(f'Invalid PASSWORD_HASH_METHOD {method!r}: scrypt takes n:r:p')
+        return ':'.join(['scrypt', *(str(int(arg)) for arg in args)])
+    if name == 'pbkdf2':
+        if len(args) > 2 or (len(args) == 2 and not args[1].isdigit()):
+            raise ValueError(f'Invalid PASSWORD_HASH_METHOD {method!r}: pbkdf2 takes hash_name:iterations')
+        hash_name = args[0] if args else 'sha256'
+        if hash_name not in hashlib.algorithms_available:
+            raise ValueError(f'Invalid PASSWORD_HASH_METHOD {method!r}: unknown hash {hash_name!r}')
+        iterations = int(args[1]) if len(args) == 2 else DEFAULT_PBKDF2_ITERATIONS
+        return f'pbkdf2:{hash_name}:{iterations}'
+    raise ValueError(f'Invalid PASSWORD_HASH_METHOD {method!r}: use scrypt or pbkdf2')
+
+
+def init_password_hasher(app):
+    # 启动时校验并补全哈希参数，needs_rehash 才能与已存储哈希的前缀逐字比较
+    app.config['PASSWORD_HASH_METHOD'] = normalize_hash_method(app.config['PASSWORD_HASH_METHOD'])
+    app.extensions['password_hasher'] = PasswordHasher(app.config['PASSWORD_HASH_WORKERS'],
+                                                       app.config['PASSWORD_HASH_QUEUE_LIMIT'])
+
+
+def _hasher():
+    if has_app_context():
+        return current_app.extensions.get('password_hasher')
+    return None
+
+
+def _method():
+    return current_app.config['PASSWORD_HASH_METHOD'] if has_app_context() else 'pbkdf2:sha256:600000'
+
+
+def _salt_length():
+    return current_app.config['PASSWORD_SALT_LENGTH'] if has_app_context() else 16
+
+
+def hash_password(password):
+    salt_length = _salt_length()
+    hasher = _hasher()
+    if hasher is None:
+        return generate_password_hash(password, _method(), salt_length)
+    return hasher.hash(password, _method(), salt_length)
+
+
+def verify_password(pwhash, password):
+    hasher = _hasher()
+    if hasher is None:
+        return check_password_hash(pwhash, password)
+    return hasher.verify(pwhash, password)
+
+
+def needs_rehash(pwhash):
+    """已存储哈希的方法参数或盐长度与当前配置不一致时返回 True"""
+    method, _, rest = pwhash.partition('$')
+    salt = rest.partition('$')[0]
+    return method != _method() or len(salt) != _salt_length()
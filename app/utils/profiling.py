@@ -0,0 +1,186 @@
+# app/utils/profiling.py
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+
+from flask import g, request, has_app_context
+from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
+from flask_login import current_user
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app import db
+
+_listeners_installed = False
+
+
+class _StackSampler(threading.Thread):
+    """采样分析器：定时抓取目标线程的调用栈，按折叠栈（collapsed stack）计数"""
+
+    def __init__(self, thread_id, interval):
+        super().__init__(name='profile-sampler', daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f'{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}')
+                frame = frame.f_back
+            if stack:
+                self.samples[';'.join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+class RequestProfile:
+    """单个请求的分析数据：采样栈与 SQL 查询列表"""
+
+    def __init__(self, interval):
+        self.method = request.method
+        self.path = request.path[:255]
+        self.started = time.perf_counter()
+        self.queries = []  # (statement, duration_ms)
+        self.sampler = _StackSampler(threading.get_ident(), interval)
+        self.sampler.start()
+
+    def stop(self):
+        if self.sampler.is_alive():
+            self.sampler.stop()
+
+    def report(self, status, repeat_threshold, max_stacks):
+        self.stop()
+        counts = Counter()
+        totals = Counter()
+        for statement, duration in self.queries:
+            counts[statement] += 1
+            totals[statement] += duration
+        # 同一条 SQL 在一次请求中重复执行多次，通常是懒加载导致的 N+1
+        repeated = [
+            {'statement': statement, 'count': count, 'total_ms': round(totals[statement], 3)}
+            for statement, count in counts.most_common() if count >= repeat_threshold
+        ]
+        stacks = '\n'.join(f'{stack} {count}' for stack, count in self.sampler.samples.most_common(max_stacks))
+        return {
+            'method': self.method,
+            'path': self.path,
+            'status': status,
+            'duration_ms': round((time.perf_counter() - self.started) * 1000, 3),
+            'query_count': len(self.queries),
+            'query_time_ms': round(sum(duration for _, duration in self.queries), 3),
+            'repeated_query_count': len(repeated),
+            'queries': json.dumps([{'statement': s, 'duration_ms': round(d, 3)} for s, d in self.queries],
+                                  ensure_ascii=False),
+            'repeated_queries': json.dumps(repeated, ensure_ascii=False),
+            'profile': stacks,
+        }
+
+
+def _current_profile():
+    return g.get('_profile') if has_app_context() else None
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_profile() is not None:
+        conn.info.setdefault('_profile_query_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get('_profile_query_start')
+    if not starts:
+        return
+    duration = (time.perf_counter() - starts.pop()) * 1000
+    profile = _current_profile()
+    if profile is not None:
+        profile.queries.append((statement, duration))
+
+
+def _handle_error(context):
+    # 语句失败时不会触发 after_cursor_execute，在这里取出开始时间，避免在连接池的连接上累积
+    if context.connection is not None:
+        _after_cursor_execute(context.connection, context.cursor, context.statement,
+                              context.parameters, context.execution_context, None)
+
+
+def _is_admin_request():
+    if current_user.is_authenticated:
+        return bool(getattr(current_user, 'is_admin', False))
+    try:
+        verify_jwt_in_request(optional=True)
+    except Exception:
+        return False
+    identity = get_jwt_identity()
+    if identity is None:
+        return False
+    from app.models import User
+    user = User.query.get(identity)
+    return bool(user and user.is_admin)
+
+
+def _should_profile(app):
+    if request.headers.get(app.config['PROFILING_HEADER']) and _is_admin_request():
+        return True
+    rate = app.config['PROFILING_SAMPLE_RATE']
+    return rate > 0 and random.random() < rate
+
+
+def init_profiling(app):
+    """注册请求分析钩子；只在 PROFILING_ENABLED 时调用，关闭时不产生任何额外开销"""
+    global _listeners_installed
+    if not _listeners_installed:
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        event.listen(Engine, 'handle_error', _handle_error)
+        _listeners_installed = True
+
+    @app.before_request
+    def start_profile():
+        if _should_profile(app):
+            g._profile = RequestProfile(app.config['PROFILING_SAMPLE_INTERVAL'])
+
+    def store_report(profile, status):
+        report = profile.report(status,
+                                app.config['PROFILING_REPEAT_THRESHOLD'],
+                                app.config['PROFILING_MAX_STACKS'])
+        from app.models import ProfileReport
+        try:
+            # 使用独立连接写入，不影响请求自身的 session 事务
+            with app.app_context(), db.engine.begin() as conn:
+                result = conn.execute(ProfileReport.__table__.insert().values(**report))
+            return result.inserted_primary_key[0]
+        except Exception:
+            app.logger.exception('Failed to store profile report')
+            return None
+
+    @app.after_request
+    def store_profile(response):
+        profile = g.get('_profile')
+        if profile is None:
+            return response
+        if response.is_streamed:
+            # 流式响应（如 NDJSON/zip 导出）的查询在响应体发送时才执行，发送完毕后再生成报告
+            status = response.status_code
+            response.call_on_close(lambda: store_report(profile, status))
+            return response
+        g.pop('_profile')
+        report_id = store_report(profile, response.status_code)
+        if report_id is not None:
+            response.headers['X-Profile-Report'] = str(report_id)
+        return response
+
+    @app.teardown_request
+    def stop_profile(exc):
+        profile = g.pop('_profile', None)
+        if profile is not None:
+            profile.stop()
@@ -0,0 +1,213 @@
+# app/utils/upload_gc.py
+import os
+import time
+from collections import defaultdict
+
+import click
+from flask import current_app, has_app_context
+from sqlalchemy import event
+
+from app import db
+from app.models import Translation
+
+COMPRESSED_PREFIX = 'compressed_'
+
+_events_installed = False
+
+
+def _scan(upload_folder):
+    """扫描 UPLOAD_FOLDER，返回 {文件名: os.stat_result}"""
+    files = {}
+    with os.scandir(upload_folder) as entries:
+        for entry in entries:
+            if entry.is_file(follow_symlinks=False):
+                files[entry.name] = entry.stat(follow_symlinks=False)
+    return files
+
+
+def _references():
+    """返回 {文件名: (引用该文件的用户ID集合, 数据库中存储的路径集合)}"""
+    refs = defaultdict(lambda: (set(), set()))
+    rows = (db.session.query(Translation.user_id, Translation.image_path)
+            .filter(Translation.image_path.isnot(None))
+            .distinct()
+            .yield_per(current_app.config['UPLOAD_GC_BATCH_SIZE']))
+    for user_id, image_path in rows:
+        users, paths = refs[os.path.basename(image_path)]
+        users.add(user_id)
+        paths.add(image_path)
+    return refs
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def collect_garbage(dry_run=False):
+    """清理上传目录，返回统计信息
+
+    1. 删除没有任何 Translation 引用的文件（孤儿文件），跳过宽限期内的新文件；
+    2. 超出单用户或全局配额时，按最近访问时间（LRU）淘汰原图，保留 compressed_ 压缩图，
+       并把相关记录的 image_path 指向压缩图。
+
+    dry_run 为 True 时只统计，不删除文件也不修改数据库。
+    """
+    config = current_app.config
+    upload_folder = config['UPLOAD_FOLDER']
+    now = time.time()
+    stats = {'orphan_files': 0, 'orphan_bytes': 0, 'evicted_files': 0, 'evicted_bytes': 0}
+
+    files = _scan(upload_folder)
+    refs = _references()
+
+    for name, st in list(files.items()):
+        source = name[len(COMPRESSED_PREFIX):] if name.startswith(COMPRESSED_PREFIX) else name
+        if name in refs or source in refs:
+            continue
+        # 上传后、写入记录前的文件也没有引用，宽限期内不处理
+        if now - st.st_mtime < config['UPLOAD_GC_GRACE_SECONDS']:
+            continue
+        if not dry_run:
+            _remove(os.path.join(upload_folder, name))
+        stats['orphan_files'] += 1
+        stats['orphan_bytes'] += st.st_size
+        del files[name]
+
+    # 只有已存在压缩图的原图可以淘汰
+    evictable = {name for name in refs if name in files and COMPRESSED_PREFIX + name in files}
+    evicted = set()
+
+    def lru(names):
+        return sorted(names, key=lambda name: files[name].st_atime)
+
+    def evict(name):
+        size = files[name].st_size
+        if name in evicted:
+            return size
+        if not dry_run:
+            compressed_path = os.path.join(upload_folder, COMPRESSED_PREFIX + name)
+            (Translation.query
+             .filter(Translation.image_path.in_(refs[name][1]))
+             .update({Translation.image_path: compressed_path}, synchronize_session=False))
+            _remove(os.path.join(upload_folder, name))
+        evicted.add(name)
+        stats['evicted_files'] += 1
+        stats['evicted_bytes'] += size
+        return size
+
+    user_quota = config['UPLOAD_USER_QUOTA_BYTES']
+    if user_quota:
+        usage = defaultdict(int)
+        owned = defaultdict(list)
+        for name, (users, _) in refs.items():
+            size = sum(files[n].st_size for n in (name, COMPRESSED_PREFIX + name) if n in files)
+            for user_id in users:
+                usage[user_id] += size
+                if name in evictable:
+                    owned[user_id].append(name)
+        for user_id, used in usage.items():
+            for name in lru(owned[user_id]):
+                if used <= user_quota:
+                    break
+                used -= evict(name)
+
+    total_quota = config['UPLOAD_TOTAL_QUOTA_BYTES']
+    if total_quota:
+        total = sum(st.st_size for name, st in files.items() if name not in evicted)
+        for name in lru(evictable - evicted):
+            if total <= total_quota:
+                break
+            total -= evict(name)
+
+    if not dry_run:
+        db.session.commit()
+
+    stats['bytes_reclaimed'] = stats['orphan_bytes'] + stats['evicted_bytes']
+    current_app.logger.info(
+        'Upload GC%s: %d orphan files (%d bytes), %d originals evicted (%d bytes), %d bytes reclaimed',
+        ' (dry run)' if dry_run else '', stats['orphan_files'], stats['orphan_bytes'],
+        stats['evicted_files'], stats['evicted_bytes'], stats['bytes_reclaimed'])
+    return stats
+
+
+def _collect_deleted_uploads(session, flush_context):
+    paths = {obj.image_path for obj in session.deleted if isinstance(obj, Translation) and obj.image_path}
+    if paths:
+        session.info.setdefault('_deleted_uploads', set()).update(paths)
+
+
+def _is_referenced(session, name):
+    """与 collect_garbage 一致按文件名匹配；原图仍被引用时其 compressed_ 压缩图也算被引用"""
+    candidates = {name}
+    if name.startswith(COMPRESSED_PREFIX):
+        candidates.add(name[len(COMPRESSED_PREFIX):])
+    for candidate in candidates:
+        rows = session.query(Translation.image_path).filter(Translation.image_path.like(f'%{candidate}'))
+        if any(os.path.basename(path) == candidate for (path,) in rows):
+            return True
+    return False
+
+
+def _check_deleted_uploads(session, flush_context):
+    paths = session.info.pop('_deleted_uploads', None)
+    if not paths:
+        return
+    names = set()
+    for path in paths:
+        name = os.path.basename(path)
+        names.update((name, COMPRESSED_PREFIX + name))
+    # 同一文件可能被其他记录引用（包括配额淘汰后指向压缩图的记录），只清理已无引用的文件
+    with session.no_autoflush:
+        unreferenced = {name for name in names if not _is_referenced(session, name)}
+    session.info.setdefault('_unreferenced_uploads', set()).update(unreferenced)
+
+
+def _remove_deleted_uploads(session):
+    names = session.info.pop('_unreferenced_uploads', None)
+    if not names or not has_app_context():
+        return
+    upload_folder = current_app.config['UPLOAD_FOLDER']
+    for name in names:
+        _remove(os.path.join(upload_folder, name))
+
+
+def _discard_deleted_uploads(session):
+    session.info.pop('_deleted_uploads', None)
+    session.info.pop('_unreferenced_uploads', None)
+
+
+def init_upload_gc(app):
+    """注册上传文件清理：删除记录时同步删除文件，以及 gc-uploads 命令"""
+    global _events_installed
+    if not _events_installed:
+        event.listen(db.session, 'after_flush', _collect_deleted_uploads)
+        event.listen(db.session, 'after_flush_postexec', _check_deleted_uploads)
+        event.listen(db.session, 'after_commit', _remove_deleted_uploads)
+        event.listen(db.session, 'after_rollback', _discard_deleted_uploads)
+        _events_installed = True
+
+    @app.cli.command('gc-uploads')
+    @click.option('--dry-run', is_flag=True, help='只统计可回收的文件，不实际删除')
+    @click.option('--loop', is_flag=True, help='常驻运行，每 UPLOAD_GC_INTERVAL 秒清理一次')
+    def gc_uploads(dry_run, loop):
+        """清理孤儿上传文件并执行配额淘汰"""
+        interval = app.config['UPLOAD_GC_INTERVAL']
+        if loop and interval <= 0:
+            raise click.UsageError('--loop requires UPLOAD_GC_INTERVAL > 0')
+        while True:
+            try:
+                stats = collect_garbage(dry_run=dry_run)
+                for key, value in stats.items():
+                    click.echo(f'{key}: {value}')
+            except Exception:
+                if not loop:
+                    raise
+                app.logger.exception('Upload GC failed')
+            finally:
+                db.session.remove()
+            if not loop:
+                break
+            time.sleep(interval)
@@ -0,0 +1,149 @@
+# app/utils/usage.py
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import click
+from sqlalchemy import case, event, func
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+
+from app import db
+from app.models import Translation, UsageRollup, User
+
+COUNTERS = ('translations', 'image_translations', 'text_translations', 'latency_ms_total', 'latency_samples')
+
+_events_installed = False
+
+
+def _deltas(rows):
+    """把新增的翻译记录按 (日期, 用户) 汇总成计数增量"""
+    deltas = defaultdict(lambda: dict.fromkeys(COUNTERS, 0))
+    for row in rows:
+        created_at = row.get('created_at') or datetime.utcnow()
+        delta = deltas[(created_at.date(), row['user_id'])]
+        delta['translations'] += 1
+        if row.get('image_path'):
+            delta['image_translations'] += 1
+        else:
+            delta['text_translations'] += 1
+        if row.get('llm_latency_ms') is not None:
+            delta['latency_ms_total'] += row['llm_latency_ms']
+            delta['latency_samples'] += 1
+    return deltas
+
+
+def record_translations(connection, rows):
+    """在 connection 所在事务中累加 rollup 计数；rows 为包含 user_id/image_path/created_at 的字典"""
+    deltas = _deltas(rows)
+    if not deltas:
+        return
+    table = UsageRollup.__table__
+    values = [{'day': day, 'user_id': user_id, **delta} for (day, user_id), delta in deltas.items()]
+
+    # 并发的当日首条插入会同时看到“无记录”，必须用数据库原生 upsert 累加
+    dialect = connection.dialect.name
+    if dialect == 'mysql':
+        stmt = mysql.insert(table).values(values)
+        connection.execute(stmt.on_duplicate_key_update(
+            {name: table.c[name] + stmt.inserted[name] for name in COUNTERS}))
+    elif dialect in ('postgresql', 'sqlite'):
+        stmt = (postgresql if dialect == 'postgresql' else sqlite).insert(table).values(values)
+        connection.execute(stmt.on_conflict_do_update(
+            index_elements=['day', 'user_id'],
+            set_={name: table.c[name] + stmt.excluded[name] for name in COUNTERS}))
+    else:
+        # 其他数据库没有可用的 upsert，先更新再插入；并发时插入可能因主键冲突失败
+        for value in values:
+            updated = connection.execute(
+                table.update()
+                .where(table.c.day == value['day'], table.c.user_id == value['user_id'])
+                .values({name: table.c[name] + value[name] for name in COUNTERS}))
+            if updated.rowcount == 0:
+                connection.execute(table.insert().values(value))
+
+
+def _after_translation_insert(mapper, connection, target):
+    record_translations(connection, [{
+        'user_id': target.user_id,
+        'image_path': target.image_path,
+        'created_at': target.created_at,
+        'llm_latency_ms': target.llm_latency_ms,
+    }])
+
+
+def backfill_usage():
+    """根据 translations 全量重建 rollup 表，返回生成的行数"""
+    has_image = Translation.image_path.isnot(None)
+    source = db.session.query(
+        func.date(Translation.created_at),
+        Translation.user_id,
+        func.count(Translation.id),
+        func.sum(case((has_image, 1), else_=0)),
+        func.sum(case((has_image, 0), else_=1)),
+        func.coalesce(func.sum(Translation.llm_latency_ms), 0),
+        func.count(Translation.llm_latency_ms),
+    ).group_by(func.date(Translation.created_at), Translation.user_id)
+
+    table = UsageRollup.__table__
+    db.session.execute(table.delete())
+    db.session.execute(table.insert().from_select(['day', 'user_id', *COUNTERS], source))
+    db.session.commit()
+    return db.session.query(func.count()).select_from(table).scalar()
+
+
+def usage_dashboard(days, top=10):
+    """读取最近 days 天的 rollup；查询量只与天数和活跃用户数有关，与历史总量无关"""
+    since = datetime.utcnow().date() - timedelta(days=days - 1)
+    daily = (db.session.query(
+                UsageRollup.day,
+                func.sum(UsageRollup.translations).label('translations'),
+                func.sum(UsageRollup.image_translations).label('image_translations'),
+                func.sum(UsageRollup.text_translations).label('text_translations'),
+                func.sum(UsageRollup.latency_ms_total).label('latency_ms_total'),
+                func.sum(UsageRollup.latency_samples).label('latency_samples'))
+             .filter(UsageRollup.day >= since)
+             .group_by(UsageRollup.day)
+             .order_by(UsageRollup.day.desc())
+             .all())
+    top_users = (db.session.query(
+                    User.username,
+                    func.sum(UsageRollup.translations).label('translations'))
+                 .join(User, User.id == UsageRollup.user_id)
+                 .filter(UsageRollup.day >= since)
+                 .group_by(UsageRollup.user_id, User.username)
+                 .order_by(func.sum(UsageRollup.translations).desc())
+                 .limit(top)
+                 .all())
+
+    def average(latency_ms_total, latency_samples):
+        return round(latency_ms_total / latency_samples, 1) if latency_samples else None
+
+    totals = {name: sum(getattr(row, name) or 0 for row in daily) for name in COUNTERS}
+    return {
+        'days': days,
+        'since': since,
+        'daily': [{
+            'day': row.day,
+            'translations': row.translations,
+            'image_translations': row.image_translations,
+            'text_translations': row.text_translations,
+            'avg_latency_ms': average(row.latency_ms_total, row.latency_samples),
+        } for row in daily],
+        'top_users': top_users,
+        'translations': totals['translations'],
+        'image_share': (round(totals['image_translations'] * 100 / totals['translations'], 1)
+                        if totals['translations'] else None),
+        'avg_latency_ms': average(totals['latency_ms_total'], totals['latency_samples']),
+    }
+
+
+def init_usage(app):
+    """注册 rollup 增量更新钩子与 backfill-usage 命令"""
+    global _events_installed
+    if not _events_installed:
+        event.listen(Translation, 'after_insert', _after_translation_insert)
+        _events_installed = True
+
+    @app.cli.command('backfill-usage')
+    def backfill_usage_command():
+        """根据已有翻译记录重建使用量 rollup"""
+        click.echo(f'Rebuilt {backfill_usage()} usage rollup rows')
@@ -3,6 +3,7 @@
 from flask import Blueprint, render_template, redirect, url_for, request, flash
 from flask_login import login_user, logout_user, login_required
 from app.models import User
+from app.utils.passwords import PasswordHashingOverloaded
 from app import db
 
 auth_bp = Blueprint('auth', __name__, url_prefix='/auth')
@@ -13,7 +14,13 @@ def login():
         username = request.form.get('username')
         password = request.form.get('password')
         user = User.query.filter_by(username=username).first()
-        if user and user.check_password(password):
+        try:
+            valid = user is not None and user.check_password(password)
+        except PasswordHashingOverloaded as e:
+            flash('Server is busy, please try again shortly', 'danger')
+            return render_template('login.html'), 503, {'Retry-After': str(e.retry_after)}
+        if valid:
+            db.session.commit()  # 保存可能发生的重新哈希
             login_user(user)
             next_page = request.args.get('next')
             return redirect(next_page or url_for('admin.index'))
@@ -0,0 +1,70 @@
+# benchmarks/login_throughput.py
+"""登录吞吐量与哈希代价的关系
+
+用法: python benchmarks/login_throughput.py [--requests 40] [--concurrency 8]
+
+对每种哈希参数注册一个用户，再用多个线程并发调用 /api/auth/login，
+输出每秒成功登录数、503 次数和平均耗时。
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db  # noqa: E402
+from app.models import User  # noqa: E402
+
+METHODS = [
+    'pbkdf2:sha256:10000',
+    'pbkdf2:sha256:100000',
+    'pbkdf2:sha256:600000',
+    'scrypt:16384:8:1',
+    'scrypt:32768:8:1',
+]
+
+
+def run(method, requests, concurrency):
+    app = create_app()
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    app.config['TESTING'] = True
+    app.config['PASSWORD_HASH_METHOD'] = method
+    with app.app_context():
+        db.create_all()
+        user = User(username='bench')
+        user.set_password('bench')
+        db.session.add(user)
+        db.session.commit()
+
+    def login(_):
+        client = app.test_client()
+        started = time.perf_counter()
+        response = client.post('/api/auth/login', json={'username': 'bench', 'password': 'bench'})
+        return response.status_code, time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(login, range(requests)))
+    elapsed = time.perf_counter() - started
+
+    ok = [latency for status, latency in results if status == 200]
+    rejected = sum(1 for status, _ in results if status == 503)
+    avg_ms = sum(ok) / len(ok) * 1000 if ok else 0.0
+    print(f'{method:<24} {len(ok) / elapsed:>10.1f} {rejected:>6} {avg_ms:>12.1f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=40)
+    parser.add_argument('--concurrency', type=int, default=8)
+    args = parser.parse_args()
+
+    print(f'{"method":<24} {"logins/s":>10} {"503s":>6} {"avg ms (ok)":>12}')
+    for method in METHODS:
+        run(method, args.requests, args.concurrency)
+
+
+if __name__ == '__main__':
+    main()
@@ -22,6 +22,42 @@ OPENAI_API_BASE = os.environ.get('OPENAI_API_BASE', 'https://lsapi.zeabur.app/v1
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
 UPLOAD_FOLDER = os.environ.get('UPLOAD_FOLDER', os.path.join(BASE_DIR, 'uploads'))
 
+# User Listing Configuration
+USERS_PAGE_SIZE = int(os.environ.get('USERS_PAGE_SIZE', 50))  # 默认每页用户数
+USERS_MAX_PAGE_SIZE = int(os.environ.get('USERS_MAX_PAGE_SIZE', 200))  # 每页用户数上限
+USERS_STREAM_BATCH_SIZE = int(os.environ.get('USERS_STREAM_BATCH_SIZE', 500))  # NDJSON 导出时服务端游标每批行数
+ADMIN_SIMPLE_PAGER = os.environ.get('ADMIN_SIMPLE_PAGER', 'false').lower() == 'true'  # 管理后台列表跳过 COUNT 查询
+
+# Translation Export/Import Configuration
+EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', 500))  # 导出时服务端游标每批行数
+IMPORT_BATCH_SIZE = int(os.environ.get('IMPORT_BATCH_SIZE', 500))  # 导入时每批插入行数
+
+# Request Profiling Configuration
+PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', 'false').lower() == 'true'  # 关闭时不注册任何钩子
+PROFILING_HEADER = os.environ.get('PROFILING_HEADER', 'X-Profile')  # 管理员请求带此头时触发分析
+PROFILING_SAMPLE_RATE = float(os.environ.get('PROFILING_SAMPLE_RATE', 0.0))  # 随机抽样比例，0 为不抽样
+PROFILING_SAMPLE_INTERVAL = float(os.environ.get('PROFILING_SAMPLE_INTERVAL', 0.005))  # 调用栈采样间隔（秒）
+PROFILING_REPEAT_THRESHOLD = int(os.environ.get('PROFILING_REPEAT_THRESHOLD', 3))  # 同一 SQL 执行次数达到此值即标记为 N+1
+PROFILING_MAX_STACKS = int(os.environ.get('PROFILING_MAX_STACKS', 100))  # 报告中保留的调用栈条数
+
+# Upload Garbage Collection Configuration
+# 定时清理不在 create_app 中启动（否则每个 gunicorn worker 和 flask 命令都会各跑一份），
+# 而是单独运行一个常驻进程：flask gc-uploads --loop，整个部署只运行一个
+UPLOAD_GC_INTERVAL = int(os.environ.get('UPLOAD_GC_INTERVAL', 0))  # gc-uploads --loop 的清理间隔（秒）
+UPLOAD_GC_GRACE_SECONDS = int(os.environ.get('UPLOAD_GC_GRACE_SECONDS', 3600))  # 新文件在此时间内不视为孤儿
+UPLOAD_GC_BATCH_SIZE = int(os.environ.get('UPLOAD_GC_BATCH_SIZE', 1000))  # 读取引用时服务端游标每批行数
+UPLOAD_USER_QUOTA_BYTES = int(os.environ.get('UPLOAD_USER_QUOTA_BYTES', 0))  # 单用户上传配额，0 为不限
+UPLOAD_TOTAL_QUOTA_BYTES = int(os.environ.get('UPLOAD_TOTAL_QUOTA_BYTES', 0))  # 上传目录总配额，0 为不限
+
+# Password Hashing Configuration
+PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:600000')  # scrypt 或 pbkdf2，启动时补全参数；与盐长度任一变更后登录时自动重新哈希
+PASSWORD_SALT_LENGTH = int(os.environ.get('PASSWORD_SALT_LENGTH', 16))
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 1))  # 同时进行哈希计算的线程数
+PASSWORD_HASH_QUEUE_LIMIT = int(os.environ.get('PASSWORD_HASH_QUEUE_LIMIT', 4))  # 等待及执行中的哈希数上限，超出返回 503
+
+# Admin Dashboard Configuration
+ADMIN_DASHBOARD_DAYS = int(os.environ.get('ADMIN_DASHBOARD_DAYS', 30))  # 管理后台首页统计的天数
+
 # Flask-Login Configuration
 LOGIN_URL = '/auth/login'  # 根据你的路由调整
 
@@ -2,6 +2,7 @@
 import unittest
 from app import create_app, db
 from app.models import User
+from app.utils.passwords import PasswordHasher, PasswordHashingOverloaded, normalize_hash_method
 import json
 
 class AuthTestCase(unittest.TestCase):
@@ -57,5 +58,106 @@ class AuthTestCase(unittest.TestCase):
         })
         self.assertEqual(response.status_code, 401)
 
+    def test_rehash_on_login(self):
+        with self.app.app_context():
+            self.app.config['PASSWORD_HASH_METHOD'] = 'pbkdf2:sha256:1000'
+            user = User(username='zho')
+            user.set_password('zho')
+            db.session.add(user)
+            db.session.commit()
+
+        self.app.config['PASSWORD_HASH_METHOD'] = 'pbkdf2:sha256:2000'
+        response = self.client.post('/api/auth/login', json={
+            'username': 'zho',
+            'password': 'zho'
+        })
+        self.assertEqual(response.status_code, 200)
+        with self.app.app_context():
+            password_hash = User.query.filter_by(username='zho').one().password_hash
+        self.assertTrue(password_hash.startswith('pbkdf2:sha256:2000$'))
+
+        # 新哈希依然可以登录
+        response = self.client.post('/api/auth/login', json={
+            'username': 'zho',
+            'password': 'zho'
+        })
+        self.assertEqual(response.status_code, 200)
+
+    def _login_zho(self):
+        return self.client.post('/api/auth/login', json={
+            'username': 'zho',
+            'password': 'zho'
+        })
+
+    def _create_zho(self):
+        with self.app.app_context():
+            user = User(username='zho')
+            user.set_password('zho')
+            db.session.add(user)
+            db.session.commit()
+
+    def _stored_hash(self):
+        with self.app.app_context():
+            return User.query.filter_by(username='zho').one().password_hash
+
+    def test_rehash_on_salt_length_change(self):
+        self.app.config['PASSWORD_HASH_METHOD'] = 'pbkdf2:sha256:1000'
+        self._create_zho()
+        self.app.config['PASSWORD_SALT_LENGTH'] = 24
+        self.assertEqual(self._login_zho().status_code, 200)
+        self.assertEqual(len(self._stored_hash().split('$')[1]), 24)
+
+        # 参数未变时不再重新哈希
+        password_hash = self._stored_hash()
+        self.assertEqual(self._login_zho().status_code, 200)
+        self.assertEqual(self._stored_hash(), password_hash)
+
+    def test_normalize_hash_method(self):
+        self.assertEqual(normalize_hash_method('scrypt'), 'scrypt:32768:8:1')
+        self.assertEqual(normalize_hash_method('pbkdf2'), 'pbkdf2:sha256:600000')
+        self.assertEqual(normalize_hash_method('pbkdf2:sha512'), 'pbkdf2:sha512:600000')
+        self.assertEqual(normalize_hash_method('pbkdf2:sha256:1000'), 'pbkdf2:sha256:1000')
+        for method in ('plain', 'md5', 'scrypt:1:2', 'pbkdf2:nohash:1000', 'pbkdf2:sha256:many'):
+            with self.assertRaises(ValueError):
+                normalize_hash_method(method)
+
+    def test_rehash_skipped_when_overloaded(self):
+        self.app.config['PASSWORD_HASH_METHOD'] = 'pbkdf2:sha256:1000'
+        self._create_zho()
+        password_hash = self._stored_hash()
+
+        class BusyHasher(PasswordHasher):
+            def hash(self, password, method, salt_length):
+                raise PasswordHashingOverloaded()
+
+        self.app.extensions['password_hasher'] = BusyHasher(workers=1, queue_limit=1)
+        self.app.config['PASSWORD_HASH_METHOD'] = 'pbkdf2:sha256:2000'
+        self.assertEqual(self._login_zho().status_code, 200)
+        self.assertEqual(self._stored_hash(), password_hash)
+
+    def test_login_overloaded(self):
+        response = self.client.post('/api/auth/register', json={
+            'username': 'zho',
+            'password': 'zho'
+        })
+        self.assertEqual(response.status_code, 201)
+
+        hasher = PasswordHasher(workers=1, queue_limit=1)
+        hasher._slots.acquire()  # 占满队列
+        self.app.extensions['password_hasher'] = hasher
+        response = self.client.post('/api/auth/login', json={
+            'username': 'zho',
+            'password': 'zho'
+        })
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.headers['Retry-After'], '1')
+
+        hasher._slots.release()
+        response = self.client.post('/api/auth/login', json={
+            'username': 'zho',
+            'password': 'zho'
+        })
+        self.assertEqual(response.status_code, 200)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,103 @@
+# tests/test_profiling.py
+
+import json
+import unittest
+from app import create_app, db
+from app.models import User, Translation, ProfileReport
+from app.utils.profiling import init_profiling
+from flask_jwt_extended import create_access_token
+
+class ProfilingTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app()
+        self.app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+        self.app.config['TESTING'] = True
+        self.app.config['JWT_SECRET_KEY'] = 'test-secret-key'
+        self.app.config['PROFILING_ENABLED'] = True
+        init_profiling(self.app)
+
+        # 逐个访问 User.translations，制造 N+1 查询
+        @self.app.route('/n-plus-one')
+        def n_plus_one():
+            return {'counts': [len(user.translations) for user in User.query.all()]}
+
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            db.create_all()
+            admin = User(username='admin', is_admin=True)
+            admin.set_password('adminpass')
+            db.session.add(admin)
+            for i in range(4):
+                user = User(username=f'user{i}')
+                user.set_password('password')
+                user.translations.append(Translation(original_text='塩', translated_text='盐'))
+                db.session.add(user)
+            db.session.commit()
+            self.admin_token = create_access_token(identity=admin.id)
+            self.user_token = create_access_token(identity=User.query.filter_by(username='user0').one().id)
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def test_admin_header_triggers_report(self):
+        response = self.client.get('/n-plus-one', headers={
+            'Authorization': f'Bearer {self.admin_token}',
+            'X-Profile': '1',
+        })
+        self.assertEqual(response.status_code, 200)
+        report_id = int(response.headers['X-Profile-Report'])
+
+        with self.app.app_context():
+            report = ProfileReport.query.get(report_id)
+            self.assertEqual(report.path, '/n-plus-one')
+            self.assertEqual(report.status, 200)
+            self.assertEqual(report.query_count, 6)
+            repeated = json.loads(report.repeated_queries)
+            self.assertEqual(len(repeated), 1)
+            self.assertEqual(repeated[0]['count'], 5)
+            self.assertIn('translations', repeated[0]['statement'])
+
+    def test_streamed_response_report_includes_stream_queries(self):
+        response = self.client.get('/api/users/?format=ndjson', headers={
+            'Authorization': f'Bearer {self.admin_token}',
+            'X-Profile': '1',
+        })
+        self.assertEqual(len(response.get_data(as_text=True).splitlines()), 5)
+        response.close()
+
+        with self.app.app_context():
+            report = ProfileReport.query.one()
+            statements = [q['statement'] for q in json.loads(report.queries)]
+        self.assertEqual(report.path, '/api/users/')
+        self.assertTrue(any('FROM users' in s and 'ORDER BY users.id' in s for s in statements))
+
+    def test_failed_query_does_not_leak_start_times(self):
+        with self.app.test_request_context('/'):
+            from flask import g
+            from app.utils.profiling import RequestProfile
+            g._profile = RequestProfile(self.app.config['PROFILING_SAMPLE_INTERVAL'])
+            with db.engine.connect() as conn:
+                with self.assertRaises(Exception):
+                    conn.exec_driver_sql('SELECT * FROM missing_table')
+                self.assertEqual(conn.info.get('_profile_query_start'), [])
+            g._profile.stop()
+
+    def test_header_ignored_for_non_admin(self):
+        response = self.client.get('/n-plus-one', headers={
+            'Authorization': f'Bearer {self.user_token}',
+            'X-Profile': '1',
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('X-Profile-Report', response.headers)
+        with self.app.app_context():
+            self.assertEqual(ProfileReport.query.count(), 0)
+
+    def test_sample_rate(self):
+        self.app.config['PROFILING_SAMPLE_RATE'] = 1.0
+        response = self.client.get('/n-plus-one')
+        self.assertIn('X-Profile-Report', response.headers)
+
+if __name__ == '__main__':
+    unittest.main()
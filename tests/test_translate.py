@@ -0,0 +1,136 @@
+# tests/test_translate.py
+
+import base64
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+import zipfile
+from datetime import datetime
+from app import create_app, db
+from app.models import User, Translation
+from flask_jwt_extended import create_access_token
+
+class TranslationArchiveTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app()
+        self.app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+        self.app.config['TESTING'] = True
+        self.app.config['JWT_SECRET_KEY'] = 'test-secret-key'
+        self.upload_folder = tempfile.mkdtemp()
+        self.app.config['UPLOAD_FOLDER'] = self.upload_folder
+        self.client = self.app.test_client()
+
+        image_path = os.path.join(self.upload_folder, 'recipe.jpg')
+        with open(image_path, 'wb') as f:
+            f.write(b'fake-jpeg-bytes')
+
+        with self.app.app_context():
+            db.create_all()
+            user = User(username='testuser')
+            user.set_password('testpassword')
+            db.session.add(user)
+            db.session.commit()
+            db.session.add_all([
+                Translation(original_text='材料', translated_text='材料', image_path=image_path, user_id=user.id),
+                Translation(original_text='手順', translated_text='步骤', image_path=image_path, user_id=user.id),
+                Translation(original_text='塩', translated_text='盐', user_id=user.id),
+            ])
+            db.session.commit()
+            self.user_id = user.id
+            self.access_token = create_access_token(identity=self.user_id)
+        self.headers = {'Authorization': f'Bearer {self.access_token}'}
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+        shutil.rmtree(self.upload_folder)
+
+    def test_export_zip(self):
+        response = self.client.get('/api/translate/translations/export', headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'application/zip')
+
+        with zipfile.ZipFile(io.BytesIO(response.get_data())) as archive:
+            self.assertEqual(archive.namelist(), ['translations.ndjson', 'images/recipe.jpg'])
+            rows = [json.loads(line) for line in archive.read('translations.ndjson').decode('utf-8').splitlines()]
+            self.assertEqual(archive.read('images/recipe.jpg'), b'fake-jpeg-bytes')
+        self.assertEqual([row['translated_text'] for row in rows], ['材料', '步骤', '盐'])
+        self.assertEqual([row['image'] for row in rows], ['recipe.jpg', 'recipe.jpg', None])
+
+    def test_export_import_roundtrip(self):
+        archives = {
+            fmt: self.client.get(f'/api/translate/translations/export?format={fmt}', headers=self.headers).get_data()
+            for fmt in ('zip', 'ndjson')
+        }
+        for fmt, archive in archives.items():
+            response = self.client.post(
+                '/api/translate/translations/import',
+                data={'file': (io.BytesIO(archive), f'translations.{fmt}')},
+                headers=self.headers,
+            )
+            self.assertEqual(response.status_code, 201)
+            self.assertEqual(response.get_json()['imported'], 3)
+
+        with self.app.app_context():
+            self.assertEqual(Translation.query.filter_by(user_id=self.user_id).count(), 9)
+            imported_paths = {t.image_path for t in Translation.query.filter(Translation.id > 3) if t.image_path}
+        # 两次导入的同一张图片按内容去重，只保存一份
+        self.assertEqual(len(imported_paths), 1)
+        self.assertEqual(len(os.listdir(self.upload_folder)), 2)
+
+    def test_import_invalid_archive(self):
+        response = self.client.post(
+            '/api/translate/translations/import',
+            data={'file': (io.BytesIO(b'not json'), 'translations.ndjson')},
+            headers=self.headers,
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def _import_ndjson(self, *rows):
+        data = ''.join(json.dumps(row, ensure_ascii=False) + '\n' for row in rows).encode('utf-8')
+        return self.client.post(
+            '/api/translate/translations/import',
+            data={'file': (io.BytesIO(data), 'translations.ndjson')},
+            headers=self.headers,
+        )
+
+    def test_import_manifest_line_not_object(self):
+        for row in ([1], None, 'text',
+                    {'image': 5, 'image_base64': 'eA=='},
+                    {'created_at': 123},
+                    {'original_text': ['塩']},
+                    {'translated_text': {'zh': '盐'}}):
+            response = self._import_ndjson(row)
+            self.assertEqual(response.status_code, 400)
+
+    def test_import_invalid_base64(self):
+        response = self._import_ndjson({'translated_text': '盐', 'image': 'a.jpg', 'image_base64': '!!!'})
+        self.assertEqual(response.status_code, 400)
+        with self.app.app_context():
+            self.assertEqual(Translation.query.count(), 3)
+
+    def test_import_aware_created_at_stored_as_utc(self):
+        response = self._import_ndjson({'translated_text': '盐', 'created_at': '2024-01-02T08:00:00+09:00'})
+        self.assertEqual(response.status_code, 201)
+        with self.app.app_context():
+            translation = Translation.query.order_by(Translation.id.desc()).first()
+            self.assertEqual(translation.created_at, datetime(2024, 1, 1, 23, 0))
+
+    def test_import_ndjson_same_name_different_content(self):
+        response = self._import_ndjson(
+            {'translated_text': 'a', 'image': 'x.jpg', 'image_base64': base64.b64encode(b'first').decode()},
+            {'translated_text': 'b', 'image': 'x.jpg', 'image_base64': base64.b64encode(b'second').decode()},
+        )
+        self.assertEqual(response.status_code, 201)
+        with self.app.app_context():
+            paths = [t.image_path for t in Translation.query.filter(Translation.id > 3).order_by(Translation.id)]
+        self.assertNotEqual(paths[0], paths[1])
+        with open(paths[1], 'rb') as f:
+            self.assertEqual(f.read(), b'second')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+# tests/test_upload_gc.py
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from app import create_app, db
+from app.models import User, Translation
+from app.utils.upload_gc import collect_garbage
+from flask_jwt_extended import create_access_token
+
+class UploadGCTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app()
+        self.app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+        self.app.config['TESTING'] = True
+        self.app.config['JWT_SECRET_KEY'] = 'test-secret-key'
+        self.upload_folder = tempfile.mkdtemp()
+        self.app.config['UPLOAD_FOLDER'] = self.upload_folder
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            db.create_all()
+            user = User(username='testuser')
+            user.set_password('testpassword')
+            db.session.add(user)
+            db.session.commit()
+            self.user_id = user.id
+            self.access_token = create_access_token(identity=self.user_id)
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+        shutil.rmtree(self.upload_folder)
+
+    def _write(self, name, size, age=7200):
+        path = os.path.join(self.upload_folder, name)
+        with open(path, 'wb') as f:
+            f.write(b'x' * size)
+        past = time.time() - age
+        os.utime(path, (past, past))
+        return path
+
+    def _add_image(self, name, size, age=7200):
+        path = self._write(name, size, age)
+        self._write(f'compressed_{name}', size // 10, age)
+        with self.app.app_context():
+            db.session.add(Translation(original_text='塩', translated_text='盐', image_path=path, user_id=self.user_id))
+            db.session.commit()
+        return path
+
+    def test_orphans(self):
+        self._add_image('kept.jpg', 100)
+        self._write('orphan.jpg', 50)
+        self._write('compressed_orphan.jpg', 5)
+        self._write('fresh.jpg', 30, age=0)
+
+        with self.app.app_context():
+            stats = collect_garbage(dry_run=True)
+            self.assertEqual(stats['orphan_files'], 2)
+            self.assertEqual(stats['bytes_reclaimed'], 55)
+            self.assertEqual(len(os.listdir(self.upload_folder)), 5)
+
+            stats = collect_garbage()
+        self.assertEqual(stats['bytes_reclaimed'], 55)
+        self.assertEqual(sorted(os.listdir(self.upload_folder)), ['compressed_kept.jpg', 'fresh.jpg', 'kept.jpg'])
+
+    def test_user_quota_evicts_least_recently_used_original(self):
+        old = self._add_image('old.jpg', 100, age=9000)
+        self._add_image('new.jpg', 100, age=8000)
+        self.app.config['UPLOAD_USER_QUOTA_BYTES'] = 150
+
+        with self.app.app_context():
+            stats = collect_garbage()
+            self.assertEqual(stats['evicted_files'], 1)
+            self.assertEqual(stats['evicted_bytes'], 100)
+            paths = {t.image_path for t in Translation.query.all()}
+        self.assertFalse(os.path.exists(old))
+        self.assertIn(os.path.join(self.upload_folder, 'compressed_old.jpg'), paths)
+        self.assertEqual(sorted(os.listdir(self.upload_folder)),
+                         ['compressed_new.jpg', 'compressed_old.jpg', 'new.jpg'])
+
+    def test_delete_user_removes_uploads(self):
+        self._add_image('recipe.jpg', 100)
+        response = self.client.delete(
+            f'/api/users/{self.user_id}',
+            headers={'Authorization': f'Bearer {self.access_token}'}
+        )
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(os.listdir(self.upload_folder), [])
+
+    def test_delete_keeps_files_still_referenced(self):
+        # 配额淘汰后 A 指向压缩图，之后同名上传的 C 指向新的原图
+        original = self._write('image.jpg', 100)
+        compressed = self._write('compressed_image.jpg', 10)
+        with self.app.app_context():
+            db.session.add(Translation(translated_text='a', image_path=compressed, user_id=self.user_id))
+            c = Translation(translated_text='c', image_path=original, user_id=self.user_id)
+            db.session.add(c)
+            db.session.commit()
+
+            db.session.delete(c)
+            db.session.commit()
+        self.assertFalse(os.path.exists(original))
+        self.assertTrue(os.path.exists(compressed))
+
+    def test_cli_dry_run(self):
+        self._write('orphan.jpg', 50)
+        result = self.app.test_cli_runner().invoke(args=['gc-uploads', '--dry-run'])
+        self.assertIn('bytes_reclaimed: 50', result.output)
+        self.assertTrue(os.path.exists(os.path.join(self.upload_folder, 'orphan.jpg')))
+
+    def test_cli_loop_requires_interval(self):
+        result = self.app.test_cli_runner().invoke(args=['gc-uploads', '--loop'])
+        self.assertNotEqual(result.exit_code, 0)
+        self.assertIn('UPLOAD_GC_INTERVAL', result.output)
+
+if __name__ == '__main__':
+    unittest.main()
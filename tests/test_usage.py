@@ -0,0 +1,80 @@
+# tests/test_usage.py
+
+import unittest
+from datetime import datetime, timedelta
+from app import create_app, db
+from app.models import User, Translation, UsageRollup
+from app.utils.usage import backfill_usage, usage_dashboard
+
+class UsageRollupTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app()
+        self.app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+        self.app.config['TESTING'] = True
+        self.client = self.app.test_client()
+
+        today = datetime.utcnow()
+        with self.app.app_context():
+            db.create_all()
+            admin = User(username='admin', is_admin=True)
+            admin.set_password('adminpass')
+            user = User(username='testuser')
+            user.set_password('testpassword')
+            db.session.add_all([admin, user])
+            db.session.commit()
+            db.session.add_all([
+                Translation(original_text='塩', translated_text='盐', user_id=user.id,
+                            llm_latency_ms=100, created_at=today),
+                Translation(original_text='', translated_text='步骤', image_path='/uploads/a.jpg', user_id=user.id,
+                            llm_latency_ms=300, created_at=today),
+                Translation(original_text='砂糖', translated_text='砂糖', user_id=admin.id,
+                            created_at=today - timedelta(days=1)),
+            ])
+            db.session.commit()
+            self.user_id = user.id
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def _rollups(self):
+        return sorted(
+            (r.day, r.user_id, r.translations, r.image_translations, r.text_translations,
+             r.latency_ms_total, r.latency_samples)
+            for r in UsageRollup.query.all()
+        )
+
+    def test_incremental_rollup(self):
+        with self.app.app_context():
+            rollup = UsageRollup.query.filter_by(user_id=self.user_id).one()
+            self.assertEqual(rollup.day, datetime.utcnow().date())
+            self.assertEqual(rollup.translations, 2)
+            self.assertEqual(rollup.image_translations, 1)
+            self.assertEqual(rollup.text_translations, 1)
+            self.assertEqual(rollup.latency_ms_total, 400)
+            self.assertEqual(rollup.latency_samples, 2)
+            self.assertEqual(UsageRollup.query.count(), 2)
+
+    def test_backfill_matches_incremental(self):
+        with self.app.app_context():
+            incremental = self._rollups()
+            self.assertEqual(backfill_usage(), 2)
+            self.assertEqual(self._rollups(), incremental)
+
+    def test_dashboard(self):
+        with self.app.app_context():
+            stats = usage_dashboard(days=30)
+        self.assertEqual(stats['translations'], 3)
+        self.assertEqual(stats['image_share'], 33.3)
+        self.assertEqual(stats['avg_latency_ms'], 200.0)
+        self.assertEqual([row['translations'] for row in stats['daily']], [2, 1])
+        self.assertEqual([user.username for user in stats['top_users']], ['testuser', 'admin'])
+
+        self.client.post('/auth/login', data={'username': 'admin', 'password': 'adminpass'})
+        response = self.client.get('/admin/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('33.3%', response.get_data(as_text=True))
+
+if __name__ == '__main__':
+    unittest.main()
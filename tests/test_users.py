@@ -1,8 +1,9 @@
 # tests/test_users.py
 
+import json
 import unittest
 from app import create_app, db
-from app.models import User
+from app.models import User, Translation
 from flask_jwt_extended import create_access_token
 
 class UserTestCase(unittest.TestCase):
@@ -38,6 +39,55 @@ class UserTestCase(unittest.TestCase):
         self.assertEqual(len(data), 1)
         self.assertEqual(data[0]['username'], 'testuser')
 
+    def test_get_users_keyset_pagination(self):
+        with self.app.app_context():
+            for i in range(4):
+                user = User(username=f'user{i}', email=f'user{i}@example.com')
+                user.set_password('password')
+                db.session.add(user)
+            db.session.commit()
+
+        headers = {'Authorization': f'Bearer {self.access_token}'}
+        response = self.client.get('/api/users/?limit=2', headers=headers)
+        self.assertEqual(response.status_code, 200)
+        first_page = response.get_json()
+        self.assertEqual([u['username'] for u in first_page], ['testuser', 'user0'])
+        cursor = response.headers['X-Next-Cursor']
+
+        response = self.client.get(f'/api/users/?limit=2&after={cursor}', headers=headers)
+        self.assertEqual([u['username'] for u in response.get_json()], ['user1', 'user2'])
+        cursor = response.headers['X-Next-Cursor']
+
+        response = self.client.get(f'/api/users/?limit=2&after={cursor}', headers=headers)
+        self.assertEqual([u['username'] for u in response.get_json()], ['user3'])
+        self.assertNotIn('X-Next-Cursor', response.headers)
+
+    def test_get_users_fields(self):
+        with self.app.app_context():
+            db.session.add_all([
+                Translation(content='a', user_id=self.user_id),
+                Translation(content='b', user_id=self.user_id),
+            ])
+            db.session.commit()
+
+        headers = {'Authorization': f'Bearer {self.access_token}'}
+        response = self.client.get('/api/users/?fields=username,translation_count', headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json(), [{'username': 'testuser', 'translation_count': 2}])
+
+        response = self.client.get('/api/users/?fields=password_hash', headers=headers)
+        self.assertEqual(response.status_code, 400)
+
+    def test_get_users_ndjson(self):
+        response = self.client.get(
+            '/api/users/?format=ndjson&fields=id,username',
+            headers={'Authorization': f'Bearer {self.access_token}'}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        lines = response.get_data(as_text=True).splitlines()
+        self.assertEqual([json.loads(line) for line in lines], [{'id': self.user_id, 'username': 'testuser'}])
+
     def test_create_user(self):
         new_user = {
             'username': 'newuser',